@@ -2,11 +2,22 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from fredapi import Fred
+import httpx
+import shutil
+import re
+import string
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from datetime import datetime, timedelta
 import warnings
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 warnings.filterwarnings('ignore')
 
 # ============================================================
@@ -89,163 +100,372 @@ except Exception as e:
     GEMINI_AVAILABLE = False
     st.sidebar.warning(f"⚠️ Gemini 초기화 실패: {str(e)}")
 
-fred = Fred(api_key=FRED_API_KEY)
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+FRED_CACHE_DIR = Path(".fred_cache")
+FRED_CACHE_TTL = timedelta(days=1)
 
 # ============================================================
 # 3. 스프레드 시나리오 정의
 # ============================================================
-SCENARIOS = {
-    1: {
-        'title': '🟡 시나리오 1: 스태그플레이션 우려',
-        'meaning': '수익률 곡선 역전 + 긴축 기대 → 인플레이션 지속 + 성장 둔화 조합',
-        'risk': '⚠️ 고위험',
-        'color': '#f57f17',
-        'assets': {
-            '주식 (성장주)': '⚠️ 축소 (20-30%)',
-            '주식 (가치주)': '✅ 유지 (30-40%)',
-            '기술주': '🔴 대폭 축소 (10-15%)',
-            '비트코인·고위험 자산': '🔴 최소화 (0-5%)',
-            '부동산/리츠': '⚠️ 선별적 (10-15%)',
-            '채권': '⚠️ 단기채 중심 (20-30%)',
-            '원자재/금': '✅ 확대 (15-20%)',
-            '현금': '✅ 비중 확대 (10-20%)'
-        }
-    },
-    2: {
-        'title': '🚨 시나리오 2: 침체 경고 (리세션 베이스)',
-        'meaning': '수익률 곡선 역전 + 완화 기대 → 경기 침체 임박 신호',
-        'risk': '⚠️⚠️ 최고위험',
-        'color': '#c62828',
-        'assets': {
-            '주식 (성장주)': '🚫 강한 축소/청산 (0-10%)',
-            '주식 (가치주)': '⚠️ 최소화 (10-20%)',
-            '기술주/고베타': '🚫 청산 권고',
-            '비트코인·고위험 자산': '🚫 비중 최소/0%',
-            '부동산/리츠': '🔴 축소 (0-5%)',
-            '채권': '✅ 장기 국채 비중 확대 (40-50%)',
-            '금·방어적 실물자산': '✅ 핵심 (20-30%)',
-            '현금': '✅ 20-30% 수준 확보'
-        }
-    },
-    3: {
-        'title': '✅ 시나리오 3: 건강한 성장',
-        'meaning': '정상 수익률 곡선 + 긴축 기대 → 건강한 성장 / 인플레이션 관리',
-        'risk': '✅ 저위험',
-        'color': '#2e7d32',
-        'assets': {
-            '주식 (성장주)': '✅ 공격적 (40-50%)',
-            '주식 (가치주)': '✅ 균형 (20-30%)',
-            '기술주': '✅ 비중 확대 (25-35%)',
-            '비트코인·위험자산': '⚠️ 선택적 (5-10%)',
-            '부동산/리츠': '✅ 우호적 환경 (10-20%)',
-            '채권': '⚠️ 최소화 (5-10%)',
-            '금·원자재': '➡️ 중립 (5-10%)',
-            '현금': '➡️ 최소 (5-10%)'
-        }
-    },
-    4: {
-        'title': '🔄 시나리오 4: 정책 전환점 (Pivot 기대)',
-        'meaning': '정상 곡선 + 완화 기대 → 긴축 사이클 종료/피벗 기대',
-        'risk': '➡️ 중간위험',
-        'color': '#1565c0',
-        'assets': {
-            '주식 (성장주)': '⚠️ 조정 (25-35%)',
-            '주식 (가치주)': '✅ 확대 (25-35%)',
-            '기술주': '⚠️ 선별적 (20-25%)',
-            '비트코인·위험자산': '✅ 점진적 확대 (10-15%)',
-            '부동산/리츠': '✅ 매수 기회 (15-20%)',
-            '채권': '✅ 장기채 비중 확대 (20-30%)',
-            '금·원자재': '➡️ 중립 (5-10%)',
-            '현금': '➡️ 10-15% 유지'
-        }
-    }
-}
+# 시나리오 번호(1-4)에서 1을 뺀 값이 각 배열의 인덱스
+SCENARIO_TITLES = np.array([
+    '🟡 시나리오 1: 스태그플레이션 우려',
+    '🚨 시나리오 2: 침체 경고 (리세션 베이스)',
+    '✅ 시나리오 3: 건강한 성장',
+    '🔄 시나리오 4: 정책 전환점 (Pivot 기대)',
+], dtype=object)
+
+SCENARIO_MEANINGS = np.array([
+    '수익률 곡선 역전 + 긴축 기대 → 인플레이션 지속 + 성장 둔화 조합',
+    '수익률 곡선 역전 + 완화 기대 → 경기 침체 임박 신호',
+    '정상 수익률 곡선 + 긴축 기대 → 건강한 성장 / 인플레이션 관리',
+    '정상 곡선 + 완화 기대 → 긴축 사이클 종료/피벗 기대',
+], dtype=object)
+
+SCENARIO_RISKS = np.array([
+    '⚠️ 고위험',
+    '⚠️⚠️ 최고위험',
+    '✅ 저위험',
+    '➡️ 중간위험',
+], dtype=object)
+
+SCENARIO_COLORS = np.array([
+    '#f57f17',
+    '#c62828',
+    '#2e7d32',
+    '#1565c0',
+], dtype=object)
+
+# 자산군 이름과 권장 비중: shape (4, 8)
+SCENARIO_ASSET_CLASSES = np.array([
+    [
+        '주식 (성장주)',
+        '주식 (가치주)',
+        '기술주',
+        '비트코인·고위험 자산',
+        '부동산/리츠',
+        '채권',
+        '원자재/금',
+        '현금',
+    ],
+    [
+        '주식 (성장주)',
+        '주식 (가치주)',
+        '기술주/고베타',
+        '비트코인·고위험 자산',
+        '부동산/리츠',
+        '채권',
+        '금·방어적 실물자산',
+        '현금',
+    ],
+    [
+        '주식 (성장주)',
+        '주식 (가치주)',
+        '기술주',
+        '비트코인·위험자산',
+        '부동산/리츠',
+        '채권',
+        '금·원자재',
+        '현금',
+    ],
+    [
+        '주식 (성장주)',
+        '주식 (가치주)',
+        '기술주',
+        '비트코인·위험자산',
+        '부동산/리츠',
+        '채권',
+        '금·원자재',
+        '현금',
+    ],
+], dtype=object)
+
+SCENARIO_ALLOCATIONS = np.array([
+    [
+        '⚠️ 축소 (20-30%)',
+        '✅ 유지 (30-40%)',
+        '🔴 대폭 축소 (10-15%)',
+        '🔴 최소화 (0-5%)',
+        '⚠️ 선별적 (10-15%)',
+        '⚠️ 단기채 중심 (20-30%)',
+        '✅ 확대 (15-20%)',
+        '✅ 비중 확대 (10-20%)',
+    ],
+    [
+        '🚫 강한 축소/청산 (0-10%)',
+        '⚠️ 최소화 (10-20%)',
+        '🚫 청산 권고',
+        '🚫 비중 최소/0%',
+        '🔴 축소 (0-5%)',
+        '✅ 장기 국채 비중 확대 (40-50%)',
+        '✅ 핵심 (20-30%)',
+        '✅ 20-30% 수준 확보',
+    ],
+    [
+        '✅ 공격적 (40-50%)',
+        '✅ 균형 (20-30%)',
+        '✅ 비중 확대 (25-35%)',
+        '⚠️ 선택적 (5-10%)',
+        '✅ 우호적 환경 (10-20%)',
+        '⚠️ 최소화 (5-10%)',
+        '➡️ 중립 (5-10%)',
+        '➡️ 최소 (5-10%)',
+    ],
+    [
+        '⚠️ 조정 (25-35%)',
+        '✅ 확대 (25-35%)',
+        '⚠️ 선별적 (20-25%)',
+        '✅ 점진적 확대 (10-15%)',
+        '✅ 매수 기회 (15-20%)',
+        '✅ 장기채 비중 확대 (20-30%)',
+        '➡️ 중립 (5-10%)',
+        '➡️ 10-15% 유지',
+    ],
+], dtype=object)
 
 # ============================================================
 # 4. 데이터 수집 함수
 # ============================================================
-@st.cache_data(ttl=3600)
-def fetch_series_with_ffill(series_id, start_date, name=""):
+FRED_SERIES = {
+    'DGS10': ('DGS10', "10년물 국채"),
+    'DGS2': ('DGS2', "2년물 국채"),
+    'T10Y2Y': ('T10Y2Y', "장단기 금리차"),
+    'HY_SPREAD': ('BAMLH0A0HYM2', "하이일드 스프레드"),
+    'IG_SPREAD': ('BAMLC0A0CM', "투자등급 스프레드"),
+    'FEDFUNDS': ('FEDFUNDS', "연준 기준금리"),
+    'EFFR': ('EFFR', "유효 연방기금금리"),
+    'WALCL': ('WALCL', "연준 총자산"),
+    'CC_DELINQ': ('DRCCLACBS', "신용카드 연체율"),
+    'CONS_DELINQ': ('DRCLACBS', "소비자 대출 연체율"),
+    'AUTO_DELINQ': ('DROCLACBS', "오토론 연체율"),
+    'CRE_DELINQ_ALL': ('DRCRELEXFACBS', "CRE 연체율"),
+    'RE_DELINQ_ALL': ('DRSREACBS', "부동산 연체율"),
+    'CRE_LOAN_AMT': ('CREACBM027NBOG', "CRE 대출 총액"),
+}
+
+def empty_series():
+    """수집 실패 시 반환할 빈 시계열"""
+    return pd.Series(dtype=np.float32, index=pd.DatetimeIndex([]))
+
+def cache_path(series_id, start_date):
+    """시리즈별 디스크 캐시 파일 경로"""
+    return FRED_CACHE_DIR / f"{series_id}_{start_date}.parquet"
+
+def read_cached_series(series_id, start_date):
+    """디스크 캐시가 유효하면 시리즈 반환, 없거나 만료되면 None"""
+    path = cache_path(series_id, start_date)
+    try:
+        age = datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)
+        if age > FRED_CACHE_TTL:
+            return None
+        return pd.read_parquet(path).iloc[:, 0].astype(np.float32, copy=False)
+    except Exception:
+        return None
+
+def prune_cache_dir():
+    """만료된 디스크 캐시 파일 삭제 (기간별 시작일이 매일 바뀌어 파일이 누적되므로)"""
+    cutoff = (datetime.now() - FRED_CACHE_TTL).timestamp()
+    for path in FRED_CACHE_DIR.glob("*.parquet"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+def write_cached_series(data, series_id, start_date):
+    """수집한 시리즈를 디스크 캐시에 저장 (실패해도 무시)"""
+    if len(data) == 0:
+        return
+    try:
+        FRED_CACHE_DIR.mkdir(exist_ok=True)
+        data.to_frame().to_parquet(cache_path(series_id, start_date))
+    except Exception:
+        pass
+
+def fetch_series_with_ffill(client, series_id, start_date):
     """FRED에서 시리즈를 가져오고 forward-fill로 결측치 보정"""
+    cached = read_cached_series(series_id, start_date)
+    if cached is not None:
+        return cached
+    
+    # httpx 예외 메시지에는 api_key가 포함된 요청 URL이 들어가므로 그대로 노출하지 않음
     try:
-        data = fred.get_series(series_id, observation_start=start_date)
-        if len(data) > 0:
-            data = data.sort_index().ffill()
-            return data
-        else:
-            return pd.Series(dtype=float)
-    except Exception as e:
-        st.warning(f"⚠️ {name or series_id} 수집 실패: {e}")
-        return pd.Series(dtype=float)
+        response = client.get(
+            FRED_OBSERVATIONS_URL,
+            params={
+                'series_id': series_id,
+                'api_key': FRED_API_KEY,
+                'file_type': 'json',
+                'observation_start': start_date,
+            }
+        )
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        try:
+            detail = e.response.json().get('error_message', '')
+        except ValueError:
+            detail = ''
+        raise RuntimeError(f"HTTP {e.response.status_code} {detail}".strip()) from None
+    except httpx.RequestError as e:
+        raise RuntimeError(f"{type(e).__name__}: FRED 요청 실패") from None
+    
+    obs = pd.DataFrame(response.json().get('observations', []), columns=['date', 'value'])
+    if len(obs) == 0:
+        return empty_series()
+    
+    data = pd.Series(
+        pd.to_numeric(obs['value'], errors='coerce').to_numpy(dtype=np.float32),
+        index=pd.to_datetime(obs['date']),
+        name=series_id
+    )
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+    
+    # 분기 없는 forward-fill: 마지막 유효값의 위치를 누적 최대값으로 전파
+    vals = data.to_numpy()
+    pos = np.where(np.isnan(vals), 0, np.arange(len(vals)))
+    np.maximum.accumulate(pos, out=pos)
+    data = pd.Series(vals[pos], index=data.index, name=series_id)
+    
+    write_cached_series(data, series_id, start_date)
+    return data
+
+@st.cache_resource
+def get_fred_client():
+    """재실행 간에도 keep-alive 연결을 재사용하는 FRED HTTP 클라이언트"""
+    limits = httpx.Limits(
+        max_connections=len(FRED_SERIES),
+        max_keepalive_connections=len(FRED_SERIES)
+    )
+    return httpx.Client(limits=limits, timeout=30.0)
 
 @st.cache_data(ttl=3600)
 def load_all_series(start_date):
-    """모든 시리즈를 한 번에 수집"""
+    """모든 시리즈를 하나의 HTTP 클라이언트와 스레드 풀로 동시에 수집"""
+    client = get_fred_client()
+    series_dict = {}
     
     with st.spinner('📡 FRED API에서 데이터 수집 중...'):
-        series_dict = {
-            'DGS10': fetch_series_with_ffill('DGS10', start_date, "10년물 국채"),
-            'DGS2': fetch_series_with_ffill('DGS2', start_date, "2년물 국채"),
-            'T10Y2Y': fetch_series_with_ffill('T10Y2Y', start_date, "장단기 금리차"),
-            'HY_SPREAD': fetch_series_with_ffill('BAMLH0A0HYM2', start_date, "하이일드 스프레드"),
-            'IG_SPREAD': fetch_series_with_ffill('BAMLC0A0CM', start_date, "투자등급 스프레드"),
-            'FEDFUNDS': fetch_series_with_ffill('FEDFUNDS', start_date, "연준 기준금리"),
-            'EFFR': fetch_series_with_ffill('EFFR', start_date, "유효 연방기금금리"),
-            'WALCL': fetch_series_with_ffill('WALCL', start_date, "연준 총자산"),
-            'CC_DELINQ': fetch_series_with_ffill('DRCCLACBS', start_date, "신용카드 연체율"),
-            'CONS_DELINQ': fetch_series_with_ffill('DRCLACBS', start_date, "소비자 대출 연체율"),
-            'AUTO_DELINQ': fetch_series_with_ffill('DROCLACBS', start_date, "오토론 연체율"),
-            'CRE_DELINQ_ALL': fetch_series_with_ffill('DRCRELEXFACBS', start_date, "CRE 연체율"),
-            'CRE_DELINQ_TOP100': fetch_series_with_ffill('DRCRELEXFT100S', start_date, "CRE 연체율(Top100)"),
-            'CRE_DELINQ_SMALL': fetch_series_with_ffill('DRCRELEXFOBS', start_date, "CRE 연체율(기타)"),
-            'RE_DELINQ_ALL': fetch_series_with_ffill('DRSREACBS', start_date, "부동산 연체율"),
-            'CRE_LOAN_AMT': fetch_series_with_ffill('CREACBM027NBOG', start_date, "CRE 대출 총액"),
-        }
+        with ThreadPoolExecutor(max_workers=len(FRED_SERIES)) as executor:
+            futures = {
+                name: executor.submit(fetch_series_with_ffill, client, sid, start_date)
+                for name, (sid, _) in FRED_SERIES.items()
+            }
+            
+            for name, future in futures.items():
+                try:
+                    series_dict[name] = future.result()
+                except Exception as e:
+                    st.warning(f"⚠️ {FRED_SERIES[name][1]} 수집 실패: {e}")
+                    series_dict[name] = empty_series()
     
+    prune_cache_dir()
     return series_dict
 
+# 차트·위험 평가·AI 분석·CSV에서 실제로 읽는 컬럼만 캐시에 보관
+MASTER_COLUMNS = [
+    'DGS10', 'DGS2', 'HY_SPREAD', 'IG_SPREAD', 'FEDFUNDS', 'EFFR', 'WALCL',
+    'CC_DELINQ', 'CONS_DELINQ', 'AUTO_DELINQ', 'CRE_DELINQ_ALL', 'RE_DELINQ_ALL',
+    'CRE_LOAN_AMT', 'YIELD_CURVE', 'RATE_GAP', 'POLICY_SPREAD',
+]
+
+def series_cache_key(s):
+    """build_master_df 캐시용 시리즈 요약 키 (전체 값 해싱 대신)"""
+    if len(s) == 0:
+        return (s.name, 0)
+    return (s.name, len(s), s.index[0], s.index[-1], s.iloc[-1])
+
+@st.cache_data(ttl=3600, hash_funcs={pd.Series: series_cache_key})
 def build_master_df(series_dict):
     """10년물 금리를 기준 인덱스로 통합 DataFrame 생성"""
-    base = series_dict['DGS10']
-    df = pd.DataFrame({'DGS10': base})
-    
-    for name, s in series_dict.items():
-        if name == 'DGS10':
-            continue
-        df[name] = s.reindex(df.index, method='ffill')
+    wide = pd.concat(series_dict, axis=1, sort=False).sort_index().ffill()
+    df = wide.reindex(series_dict['DGS10'].dropna().index)
     
     # 파생 지표 계산
-    df['YIELD_CURVE_DIRECT'] = series_dict['T10Y2Y'].reindex(df.index, method='ffill')
-    df['YIELD_CURVE_CALC'] = df['DGS10'] - df['DGS2']
-    df['YIELD_CURVE'] = df['YIELD_CURVE_DIRECT'].fillna(df['YIELD_CURVE_CALC'])
-    df['RATE_GAP'] = df['DGS10'] - df['FEDFUNDS']
-    df['POLICY_SPREAD'] = df['DGS2'] - df['EFFR']
-    
-    return df.dropna(subset=['DGS10'])
+    dgs10 = df['DGS10'].to_numpy()
+    dgs2 = df['DGS2'].to_numpy()
+    direct = df['T10Y2Y'].to_numpy()
+    df['YIELD_CURVE'] = np.where(np.isnan(direct), dgs10 - dgs2, direct)
+    df['RATE_GAP'] = dgs10 - df['FEDFUNDS'].to_numpy()
+    df['POLICY_SPREAD'] = dgs2 - df['EFFR'].to_numpy()
+    
+    return df[MASTER_COLUMNS]
 
 # ============================================================
 # 5. 분석 함수들
 # ============================================================
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def scan_inversions(vals):
+        """역전 구간의 시작/종료 위치 스캔 (Numba JIT 커널)"""
+        n = vals.shape[0]
+        starts = np.empty(n // 2 + 1, np.int64)
+        ends = np.empty(n // 2 + 1, np.int64)
+        count = 0
+        in_inv = False
+        
+        for i in range(n):
+            v = vals[i]
+            if v != v:  # NaN
+                continue
+            if v < 0:
+                if not in_inv:
+                    in_inv = True
+                    starts[count] = i
+            elif in_inv:
+                ends[count] = i
+                count += 1
+                in_inv = False
+        
+        if in_inv:
+            ends[count] = n - 1
+            count += 1
+        
+        return starts[:count], ends[:count]
+
 def find_inversion_periods(yield_curve_series):
     """수익률 곡선 역전 구간 탐지"""
-    inversions = []
-    in_inv = False
-    start = None
-    
-    for date, val in yield_curve_series.items():
-        if pd.isna(val):
-            continue
-        if val < 0 and not in_inv:
-            in_inv = True
-            start = date
-        elif val >= 0 and in_inv:
-            inversions.append((start, date))
-            in_inv = False
-    
-    if in_inv:
-        inversions.append((start, yield_curve_series.index[-1]))
-    
-    return inversions
+    if NUMBA_AVAILABLE:
+        vals = yield_curve_series.to_numpy(dtype=np.float64)
+        starts, ends = scan_inversions(vals)
+        idx = yield_curve_series.index
+        return list(zip(idx[starts], idx[ends]))
+    
+    s = yield_curve_series.dropna()
+    if len(s) == 0:
+        return []
+    
+    # 역전 여부 마스크의 상승/하강 엣지로 구간 경계 탐지
+    mask = (s.to_numpy() < 0).astype(np.int8)
+    edges = np.diff(mask, prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    
+    # 종료일은 역전이 해소된 첫 날짜, 진행 중인 역전은 마지막 날짜
+    end_dates = list(s.index[ends[:-1]]) if mask[-1] else list(s.index[ends])
+    if mask[-1]:
+        end_dates.append(yield_curve_series.index[-1])
+    
+    return list(zip(s.index[starts], end_dates))
+
+# 지표별 위험 구간표: (컬럼, 구간 경계, searchsorted side, 구간별 점수, 구간별 경고)
+# side='right'는 "경계 미만", side='left'는 "경계 초과" 비교와 동일
+RISK_RULES = [
+    ('YIELD_CURVE', [0.0, 0.3], 'right', [3, 1, 0],
+     ["🔴 수익률 곡선 역전 (경기침체 전조)", "⚠️ 수익률 곡선 평탄화 (역전 임박)", None]),
+    ('DGS10', [4.0, 4.5], 'left', [0, 1, 2],
+     [None, "💡 10년물 금리 상승 추세", "⚠️ 10년물 금리 고점 영역"]),
+    ('HY_SPREAD', [4.5, 5.0], 'left', [0, 2, 3],
+     [None, "⚠️ 하이일드 스프레드 확대", "🔴 하이일드 스프레드 급등"]),
+    ('RATE_GAP', [0.5, 1.0], 'left', [0, 1, 2],
+     [None, "💧 금리 괴리 확대", "💧 금리 괴리 과도 확대"]),
+    ('CC_DELINQ', [3.5, 5.0], 'left', [0, 2, 3],
+     [None, "🪳 신용카드 연체율 급등", "🔴 신용카드 연체율 >5%"]),
+    ('CRE_DELINQ_ALL', [2.0, 3.0], 'left', [0, 2, 3],
+     [None, "🏢 CRE 연체율 상승", "🔴 CRE 연체율 >3%"]),
+    ('AUTO_DELINQ', [2.5, 3.0], 'left', [0, 1, 2],
+     [None, "🚗 오토론 연체율 상승세", "🚗 오토론 연체율 >3%"]),
+]
 
 def assess_macro_risk(df):
     """종합 위험도 평가"""
@@ -253,76 +473,20 @@ def assess_macro_risk(df):
     risk_score = 0
     warnings_ = []
     
-    # 1) 수익률 곡선
-    yc = latest['YIELD_CURVE']
-    if yc < 0:
-        risk_score += 3
-        warnings_.append("🔴 수익률 곡선 역전 (경기침체 전조)")
-    elif yc < 0.3:
-        risk_score += 1
-        warnings_.append("⚠️ 수익률 곡선 평탄화 (역전 임박)")
-    
-    # 2) 10년물 금리
-    if latest['DGS10'] > 4.5:
-        risk_score += 2
-        warnings_.append("⚠️ 10년물 금리 고점 영역")
-    elif latest['DGS10'] > 4.0:
-        risk_score += 1
-        warnings_.append("💡 10년물 금리 상승 추세")
-    
-    # 3) 하이일드 스프레드
-    hy = latest['HY_SPREAD']
-    if hy > 5.0:
-        risk_score += 3
-        warnings_.append("🔴 하이일드 스프레드 급등")
-    elif hy > 4.5:
-        risk_score += 2
-        warnings_.append("⚠️ 하이일드 스프레드 확대")
-    
-    # 4) 금리 괴리
-    rg = latest['RATE_GAP']
-    if rg > 1.0:
-        risk_score += 2
-        warnings_.append("💧 금리 괴리 과도 확대")
-    elif rg > 0.5:
-        risk_score += 1
-        warnings_.append("💧 금리 괴리 확대")
-    
-    # 5) 신용카드 연체율
-    if 'CC_DELINQ' in df.columns:
-        cc = df['CC_DELINQ'].dropna()
-        if len(cc) > 0:
-            cc_val = cc.iloc[-1]
-            if cc_val > 5.0:
-                risk_score += 3
-                warnings_.append("🔴 신용카드 연체율 >5%")
-            elif cc_val > 3.5:
-                risk_score += 2
-                warnings_.append("🪳 신용카드 연체율 급등")
-    
-    # 6) CRE 연체율
-    if 'CRE_DELINQ_ALL' in df.columns:
-        cre = df['CRE_DELINQ_ALL'].dropna()
-        if len(cre) > 0:
-            cre_val = cre.iloc[-1]
-            if cre_val > 3.0:
-                risk_score += 3
-                warnings_.append("🔴 CRE 연체율 >3%")
-            elif cre_val > 2.0:
-                risk_score += 2
-                warnings_.append("🏢 CRE 연체율 상승")
-    
-    # 7) 오토론 연체율
-    if 'AUTO_DELINQ' in df.columns:
-        au = df['AUTO_DELINQ'].dropna()
-        if len(au) > 0:
-            au_val = au.iloc[-1]
-            if au_val > 3.0:
-                risk_score += 2
-                warnings_.append("🚗 오토론 연체율 >3%")
-            elif au_val > 2.5:
-                risk_score += 1
-                warnings_.append("🚗 오토론 연체율 상승세")
+    # 규칙에 쓰이는 컬럼을 한 번에 배열로 가져와 컬럼별 마지막 유효값 위치 계산
+    arr = df.reindex(columns=[rule[0] for rule in RISK_RULES]).to_numpy()
+    valid = ~np.isnan(arr)
+    has_value = valid.any(axis=0)
+    last_pos = len(arr) - 1 - np.argmax(valid[::-1], axis=0)
+    
+    for i, (col, bounds, side, scores, messages) in enumerate(RISK_RULES):
+        if not has_value[i]:
+            continue
+        
+        tier = np.searchsorted(bounds, arr[last_pos[i], i], side=side)
+        risk_score += scores[tier]
+        if messages[tier]:
+            warnings_.append(messages[tier])
     
     # 위험도 등급
     if risk_score >= 10:
@@ -346,70 +510,78 @@ def assess_macro_risk(df):
         "latest": latest
     }
 
+# (역전 여부 << 1) | 완화 기대 여부 → 시나리오 번호
+SCENARIO_LUT = np.array([3, 4, 1, 2], dtype=np.int8)
+
 def determine_scenario(yield_curve, policy_spread):
     """금리 스프레드 기반 시나리오 판별"""
-    inverted = yield_curve < 0
-    easing_expected = policy_spread < 0
-    
-    if inverted and not easing_expected:
-        return 1  # 스태그플레이션
-    elif inverted and easing_expected:
-        return 2  # 침체 경고
-    elif not inverted and not easing_expected:
-        return 3  # 건강한 성장
-    else:
-        return 4  # 정책 전환점
+    return int(SCENARIO_LUT[(int(yield_curve < 0) << 1) | int(policy_spread < 0)])
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def classify_scenarios(yield_curve, policy_spread):
+        """시나리오 일괄 판별 (Numba JIT 커널)"""
+        out = np.empty(yield_curve.shape[0], np.int8)
+        for i in range(yield_curve.shape[0]):
+            out[i] = SCENARIO_LUT[(yield_curve[i] < 0) * 2 + (policy_spread[i] < 0)]
+        return out
+
+def determine_scenario_batch(df):
+    """전체 기간의 시나리오를 한 번에 판별"""
+    if NUMBA_AVAILABLE:
+        return classify_scenarios(df['YIELD_CURVE'].to_numpy(), df['POLICY_SPREAD'].to_numpy())
+    
+    inverted = (df['YIELD_CURVE'].to_numpy() < 0).astype(np.int8)
+    easing_expected = (df['POLICY_SPREAD'].to_numpy() < 0).astype(np.int8)
+    return SCENARIO_LUT[(inverted << 1) | easing_expected]
 
 # ============================================================
 # 6. Gemini AI 분석 함수들
 # ============================================================
+SECTION_RE = re.compile(r'(MARKET_STATUS:|KEY_RISKS:|STRATEGY:|FULL_ANALYSIS:|```)')
+
+@lru_cache(maxsize=32)
+def parse_sections(text):
+    """응답 텍스트를 한 번의 분할로 섹션별 딕셔너리로 변환"""
+    parts = SECTION_RE.split(text)
+    sections = {}
+    
+    # split 결과: [머리말, 구분자, 본문, 구분자, 본문, ...]
+    # 섹션은 자신을 제외한 다음 헤더 또는 ``` 직전까지
+    for i in range(1, len(parts), 2):
+        header = parts[i]
+        if header == "```" or header in sections:
+            continue
+        body = [parts[i + 1]]
+        j = i + 2
+        while j < len(parts) and parts[j] == header:
+            body += [header, parts[j + 1]]
+            j += 2
+        sections[header] = "".join(body).strip()
+    
+    return sections
+
 def extract_section(text, section_name):
     """텍스트에서 특정 섹션 추출"""
     try:
-        if section_name not in text:
-            return None
-        
-        start = text.find(section_name) + len(section_name)
-        
-        next_sections = ["MARKET_STATUS:", "KEY_RISKS:", "STRATEGY:", "FULL_ANALYSIS:", "```"]
-        end = len(text)
-        
-        for next_section in next_sections:
-            if next_section == section_name:
-                continue
-            pos = text.find(next_section, start)
-            if pos != -1 and pos < end:
-                end = pos
-        
-        section = text[start:end].strip()
-        section = section.replace("```", "").strip()
-        
-        return section
-        
+        return parse_sections(text).get(section_name)
     except Exception:
         return None
 
-def generate_market_summary(df, risk_info, scenario_info):
-    """메인 대시보드용 간결한 AI 시장 분석 요약"""
-    if not GEMINI_AVAILABLE:
-        return {
-            'market_status': '⚠️ API 없음',
-            'key_risks': '⚠️ API 없음',
-            'strategy': '⚠️ API 없음',
-            'full_analysis': '⚠️ Gemini API가 설정되지 않았습니다.'
-        }
-    
-    latest = df.iloc[-1]
-    
-    prompt = f"""
+@st.cache_resource
+def get_gemini_model():
+    """Gemini 모델 인스턴스를 한 번만 생성해 재사용"""
+    return genai.GenerativeModel('gemini-2.0-flash-exp')
+
+MARKET_SUMMARY_PROMPT = string.Template("""
 당신은 금융시장 전문가입니다. 다음 데이터를 바탕으로 **간결하고 실용적인** 시장 분석을 제공하세요.
 
-## 현재 시장 데이터 ({df.index[-1].strftime('%Y-%m-%d')})
-- 수익률 곡선(10Y-2Y): {latest['YIELD_CURVE']:.2f}%p
-- 10년물 금리: {latest['DGS10']:.2f}%
-- 하이일드 스프레드: {latest['HY_SPREAD']:.2f}%
-- 종합 위험도: {risk_info['level']}
-- 현재 시나리오: {scenario_info['title']}
+## 현재 시장 데이터 ($date)
+- 수익률 곡선(10Y-2Y): $yield_curve%p
+- 10년물 금리: $dgs10%
+- 하이일드 스프레드: $hy_spread%
+- 종합 위험도: $risk_level
+- 현재 시나리오: $scenario_title
 
 ## 요청사항 (각 항목을 **2-3문장**으로 간결하게):
 
@@ -444,10 +616,31 @@ FULL_ANALYSIS:
 ```
 
 간결하고 실용적으로 작성하세요.
-"""
+""")
+
+def generate_market_summary(df, risk_info, scenario_num, placeholder=None):
+    """메인 대시보드용 간결한 AI 시장 분석 요약 (placeholder가 있으면 스트리밍 표시)"""
+    if not GEMINI_AVAILABLE:
+        return {
+            'market_status': '⚠️ API 없음',
+            'key_risks': '⚠️ API 없음',
+            'strategy': '⚠️ API 없음',
+            'full_analysis': '⚠️ Gemini API가 설정되지 않았습니다.'
+        }
+    
+    latest = df.iloc[-1]
+    
+    prompt = MARKET_SUMMARY_PROMPT.substitute(
+        date=df.index[-1].strftime('%Y-%m-%d'),
+        yield_curve=f"{latest['YIELD_CURVE']:.2f}",
+        dgs10=f"{latest['DGS10']:.2f}",
+        hy_spread=f"{latest['HY_SPREAD']:.2f}",
+        risk_level=risk_info['level'],
+        scenario_title=SCENARIO_TITLES[scenario_num - 1]
+    )
     
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        model = get_gemini_model()
         
         safety_settings = [
             {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
@@ -462,18 +655,25 @@ FULL_ANALYSIS:
                 'max_output_tokens': 1024,
                 'temperature': 0.7
             },
-            safety_settings=safety_settings
+            safety_settings=safety_settings,
+            stream=True
         )
         
-        if not response.candidates or not response.candidates[0].content.parts:
+        text = ""
+        for chunk in response:
+            if not chunk.candidates or not chunk.candidates[0].content.parts:
+                continue
+            text += chunk.text
+            if placeholder is not None:
+                placeholder.markdown(text)
+        
+        if not text:
             return {
                 'market_status': '⚠️ AI 응답 생성 실패',
                 'key_risks': '안전 필터에 의해 차단되었습니다.',
                 'strategy': '다시 시도하세요',
                 'full_analysis': '응답이 차단되었습니다.'
             }
-            
-        text = response.text
 
         # 섹션 추출
         market_status = extract_section(text, "MARKET_STATUS:")
@@ -540,7 +740,7 @@ def generate_comprehensive_analysis(df, risk_info):
 """
     
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        model = get_gemini_model()
         
         safety_settings = [
             {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
@@ -616,19 +816,13 @@ def generate_indicator_analysis(df, indicator_name, depth="기본"):
     else:
         change_30d = 0
     
-    ma_info = ""
-    if f"{col}_MA7" in df.columns:
-        ma7 = df[f"{col}_MA7"].dropna().iloc[-1] if len(df[f"{col}_MA7"].dropna()) > 0 else val
-        ma30 = df[f"{col}_MA30"].dropna().iloc[-1] if len(df[f"{col}_MA30"].dropna()) > 0 else val
-        ma_info = f"\n- MA7: {ma7:.2f}{unit}, MA30: {ma30:.2f}{unit}"
-    
     prompt = f"""
 {display} 지표를 깊이 분석해주세요. 한국어로 답변하세요.
 
 ## 지표 정보:
 - 현재 값: {val:.2f}{unit}
 - 7일 변화율: {change_7d:+.1f}%
-- 30일 변화율: {change_30d:+.1f}%{ma_info}
+- 30일 변화율: {change_30d:+.1f}%
 
 ## 분석 깊이: {depth}
 - '요약': 각 항목 1-2문장
@@ -647,7 +841,7 @@ def generate_indicator_analysis(df, indicator_name, depth="기본"):
 """
     
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        model = get_gemini_model()
         tokens = 2048 if depth == "딥다이브" else 1024
         
         safety_settings = [
@@ -709,7 +903,7 @@ def generate_chat_response(df, risk_info, user_question, history):
 """
     
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        model = get_gemini_model()
         
         safety_settings = [
             {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
@@ -741,10 +935,50 @@ def generate_chat_response(df, risk_info, user_question, history):
 # ============================================================
 # 7. 차트 생성 함수들
 # ============================================================
+def stacked_subplot_layout(subplot_titles, row_heights, vertical_spacing):
+    """make_subplots(rows=N, cols=1)과 같은 축 배치를 layout 딕셔너리로 생성"""
+    rows = len(subplot_titles)
+    usable = 1 - vertical_spacing * (rows - 1)
+    total = sum(row_heights)
+    layout = {'annotations': [], 'shapes': []}
+    
+    top = 1.0
+    for row, (title, height) in enumerate(zip(subplot_titles, row_heights), start=1):
+        bottom = top - usable * height / total
+        suffix = '' if row == 1 else str(row)
+        layout[f'xaxis{suffix}'] = {'anchor': f'y{suffix}', 'domain': [0.0, 1.0]}
+        layout[f'yaxis{suffix}'] = {'anchor': f'x{suffix}', 'domain': [max(bottom, 0.0), top]}
+        layout['annotations'].append({
+            'text': title, 'showarrow': False, 'font': {'size': 16},
+            'x': 0.5, 'xref': 'paper', 'xanchor': 'center',
+            'y': top, 'yref': 'paper', 'yanchor': 'bottom'
+        })
+        top = bottom - vertical_spacing
+    
+    return layout
+
+def line_trace(x, y, name, color, row, **kwargs):
+    """지정한 행(row)의 축에 연결된 scatter 트레이스 딕셔너리"""
+    suffix = '' if row == 1 else str(row)
+    return {
+        'type': 'scatter', 'x': x, 'y': y, 'name': name,
+        'line': {'color': color, 'width': kwargs.pop('width', 2)},
+        'xaxis': f'x{suffix}', 'yaxis': f'y{suffix}',
+        **kwargs
+    }
+
+def zero_line(row, color):
+    """지정한 행에 y=0 점선 (add_hline과 동일한 shape)"""
+    suffix = '' if row == 1 else str(row)
+    return {
+        'type': 'line', 'x0': 0, 'x1': 1, 'xref': f'x{suffix} domain',
+        'y0': 0, 'y1': 0, 'yref': f'y{suffix}',
+        'line': {'dash': 'dash', 'color': color}
+    }
+
 def plot_macro_risk_dashboard(df, inversion_periods, risk, period_name):
     """5개 패널 메인 대시보드"""
-    fig = make_subplots(
-        rows=5, cols=1,
+    layout = stacked_subplot_layout(
         subplot_titles=(
             '🔴 수익률 곡선 (10Y-2Y) & 역전 구간',
             '💧 단·장기 금리 & 기준금리',
@@ -752,96 +986,105 @@ def plot_macro_risk_dashboard(df, inversion_periods, risk, period_name):
             '🪳 신용 스프레드 (High Yield & IG)',
             '🪳 연체율 (신용카드 / 소비자 / 오토 / CRE)'
         ),
-        vertical_spacing=0.06,
-        row_heights=[0.22, 0.2, 0.18, 0.18, 0.22]
+        row_heights=[0.22, 0.2, 0.18, 0.18, 0.22],
+        vertical_spacing=0.06
     )
+    x = df.index
     
-    # 1) 수익률 곡선
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['YIELD_CURVE'], name='10Y-2Y',
-                   line=dict(color='darkred', width=2.5),
+    traces = [
+        # 1) 수익률 곡선
+        line_trace(x, df['YIELD_CURVE'], '10Y-2Y', 'darkred', 1, width=2.5,
                    fill='tozeroy', fillcolor='rgba(139,0,0,0.15)'),
-        row=1, col=1
-    )
-    fig.add_hline(y=0, line_dash="dash", line_color="black", row=1, col=1)
-    for start, end in inversion_periods:
-        fig.add_vrect(x0=start, x1=end, fillcolor="rgba(255,0,0,0.25)",
-                      layer="below", line_width=0, row=1, col=1)
-    
-    # 2) 금리
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS10'], name='10Y', line=dict(color='blue', width=2)), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS2'], name='2Y', line=dict(color='orange', width=2)), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['FEDFUNDS'], name='FFR', line=dict(color='green', width=2)), row=2, col=1)
-    
-    # 3) 금리 괴리
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['RATE_GAP'], name='10Y-FFR',
-                   line=dict(color='purple', width=2),
+        # 2) 금리
+        line_trace(x, df['DGS10'], '10Y', 'blue', 2),
+        line_trace(x, df['DGS2'], '2Y', 'orange', 2),
+        line_trace(x, df['FEDFUNDS'], 'FFR', 'green', 2),
+        # 3) 금리 괴리
+        line_trace(x, df['RATE_GAP'], '10Y-FFR', 'purple', 3,
                    fill='tozeroy', fillcolor='rgba(128,0,128,0.1)'),
-        row=3, col=1
-    )
-    
-    # 4) 스프레드
-    fig.add_trace(go.Scatter(x=df.index, y=df['HY_SPREAD'], name='HY', line=dict(color='red', width=2)), row=4, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['IG_SPREAD'], name='IG', line=dict(color='cyan', width=2)), row=4, col=1)
+        # 4) 스프레드
+        line_trace(x, df['HY_SPREAD'], 'HY', 'red', 4),
+        line_trace(x, df['IG_SPREAD'], 'IG', 'cyan', 4),
+    ]
     
     # 5) 연체율
-    if 'CC_DELINQ' in df:
-        fig.add_trace(go.Scatter(x=df.index, y=df['CC_DELINQ'], name='카드', mode='lines+markers', line=dict(color='red', width=2)), row=5, col=1)
-    if 'AUTO_DELINQ' in df:
-        fig.add_trace(go.Scatter(x=df.index, y=df['AUTO_DELINQ'], name='오토', mode='lines+markers', line=dict(color='green', width=2)), row=5, col=1)
-    if 'CRE_DELINQ_ALL' in df:
-        fig.add_trace(go.Scatter(x=df.index, y=df['CRE_DELINQ_ALL'], name='CRE', mode='lines+markers', line=dict(color='brown', width=2)), row=5, col=1)
-    
-    fig.update_layout(
+    for col, name, color in [('CC_DELINQ', '카드', 'red'),
+                             ('AUTO_DELINQ', '오토', 'green'),
+                             ('CRE_DELINQ_ALL', 'CRE', 'brown')]:
+        if col in df:
+            traces.append(line_trace(x, df[col], name, color, 5, mode='lines+markers'))
+    
+    layout['shapes'].append(zero_line(1, 'black'))
+    for start, end in inversion_periods:
+        layout['shapes'].append({
+            'type': 'rect', 'x0': start, 'x1': end, 'xref': 'x',
+            'y0': 0, 'y1': 1, 'yref': 'y domain',
+            'fillcolor': 'rgba(255,0,0,0.25)', 'layer': 'below', 'line': {'width': 0}
+        })
+    
+    layout.update(
         height=1800,
-        title_text=f"<b>🏦 금융 위험관리 대시보드</b><br><sub>{period_name} | {risk['level']} (점수: {risk['score']}/20)</sub>",
+        title={'text': f"<b>🏦 금융 위험관리 대시보드</b><br><sub>{period_name} | {risk['level']} (점수: {risk['score']}/20)</sub>"},
         showlegend=True,
         hovermode='x unified'
     )
     
-    return fig
+    # 트레이스/레이아웃을 직접 구성했으므로 속성별 검증 생략
+    return go.Figure({'data': traces, 'layout': layout}, _validate=False)
+
+def plot_scenario_timeline(df, scenarios):
+    """기간별 시나리오 히트맵 스트립"""
+    # 시나리오 1-4를 각 시나리오 색상의 계단형 컬러스케일에 매핑
+    colorscale = []
+    for i, color in enumerate(SCENARIO_COLORS):
+        colorscale += [[i / 4, color], [(i + 1) / 4, color]]
+    
+    trace = {
+        'type': 'heatmap', 'x': df.index, 'y': ['시나리오'], 'z': [scenarios],
+        'zmin': 0.5, 'zmax': 4.5, 'colorscale': colorscale, 'showscale': False,
+        'customdata': [SCENARIO_TITLES[scenarios - 1]],
+        'hovertemplate': '%{x|%Y-%m-%d}<br>%{customdata}<extra></extra>'
+    }
+    layout = {
+        'height': 180,
+        'title': {'text': "<b>🎯 시나리오 타임라인</b>"},
+        'yaxis': {'showticklabels': False},
+        'margin': {'t': 50, 'b': 30}
+    }
+    
+    return go.Figure({'data': [trace], 'layout': layout}, _validate=False)
 
 def plot_scenario_analysis(df, period_name):
     """시나리오 분석 차트"""
-    fig = make_subplots(
-        rows=3, cols=1,
+    layout = stacked_subplot_layout(
         subplot_titles=('금리 추이', '수익률 곡선', '정책 스프레드'),
-        vertical_spacing=0.12,
-        row_heights=[0.4, 0.3, 0.3]
+        row_heights=[0.4, 0.3, 0.3],
+        vertical_spacing=0.12
     )
-    
-    # 금리
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS10'], name='10Y', line=dict(color='blue', width=2)), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['DGS2'], name='2Y', line=dict(color='orange', width=2)), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df.index, y=df['EFFR'], name='EFFR', line=dict(color='green', width=2)), row=1, col=1)
-    
-    # 수익률 곡선
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['YIELD_CURVE'], name='10Y-2Y',
-                   line=dict(color='purple', width=2),
+    x = df.index
+    
+    traces = [
+        # 금리
+        line_trace(x, df['DGS10'], '10Y', 'blue', 1),
+        line_trace(x, df['DGS2'], '2Y', 'orange', 1),
+        line_trace(x, df['EFFR'], 'EFFR', 'green', 1),
+        # 수익률 곡선
+        line_trace(x, df['YIELD_CURVE'], '10Y-2Y', 'purple', 2,
                    fill='tozeroy', fillcolor='rgba(128,0,128,0.1)'),
-        row=2, col=1
-    )
-    fig.add_hline(y=0, line_dash="dash", line_color="gray", row=2, col=1)
-    
-    # 정책 스프레드
-    fig.add_trace(
-        go.Scatter(x=df.index, y=df['POLICY_SPREAD'], name='2Y-EFFR',
-                   line=dict(color='orange', width=2),
+        # 정책 스프레드
+        line_trace(x, df['POLICY_SPREAD'], '2Y-EFFR', 'orange', 3,
                    fill='tozeroy', fillcolor='rgba(255,165,0,0.1)'),
-        row=3, col=1
-    )
-    fig.add_hline(y=0, line_dash="dash", line_color="gray", row=3, col=1)
+    ]
+    layout['shapes'] += [zero_line(2, 'gray'), zero_line(3, 'gray')]
     
-    fig.update_layout(
+    layout.update(
         height=1000,
-        title_text=f"<b>금리 스프레드 분석</b><br><sub>{period_name}</sub>",
+        title={'text': f"<b>금리 스프레드 분석</b><br><sub>{period_name}</sub>"},
         showlegend=True,
         hovermode='x unified'
     )
     
-    return fig
+    return go.Figure({'data': traces, 'layout': layout}, _validate=False)
 
 # ============================================================
 # 8. 메인 앱
@@ -879,6 +1122,7 @@ def main():
     
     if st.sidebar.button("🔄 데이터 새로고침", type="primary"):
         st.cache_data.clear()
+        shutil.rmtree(FRED_CACHE_DIR, ignore_errors=True)
         st.rerun()
 
      
@@ -918,7 +1162,8 @@ def main():
     yc = latest['YIELD_CURVE']
     ps = latest['POLICY_SPREAD']
     scenario_num = determine_scenario(yc, ps)
-    scenario_info = SCENARIOS[scenario_num]
+    scenario_history = determine_scenario_batch(df)
+    sc = scenario_num - 1
     
     # 상단 메트릭
     st.markdown("### 📊 핵심 지표")
@@ -975,17 +1220,17 @@ def main():
     
     st.markdown(
         f"""
-        <div style='padding: 20px; border-radius: 10px; background-color: {scenario_info['color']}20; border-left: 5px solid {scenario_info['color']}'>
-            <h3>{scenario_info['title']}</h3>
-            <p><strong>의미:</strong> {scenario_info['meaning']}</p>
-            <p><strong>위험도:</strong> {scenario_info['risk']}</p>
+        <div style='padding: 20px; border-radius: 10px; background-color: {SCENARIO_COLORS[sc]}20; border-left: 5px solid {SCENARIO_COLORS[sc]}'>
+            <h3>{SCENARIO_TITLES[sc]}</h3>
+            <p><strong>의미:</strong> {SCENARIO_MEANINGS[sc]}</p>
+            <p><strong>위험도:</strong> {SCENARIO_RISKS[sc]}</p>
         </div>
         """,
         unsafe_allow_html=True
     )
     
     with st.expander("📋 자산군별 권장 비중 (참고용)", expanded=False):
-        for asset, alloc in scenario_info['assets'].items():
+        for asset, alloc in zip(SCENARIO_ASSET_CLASSES[sc], SCENARIO_ALLOCATIONS[sc]):
             st.markdown(f"- **{asset}**: {alloc}")
     
     # AI 분석 요약 (메인 대시보드)
@@ -1002,9 +1247,10 @@ def main():
             auto_analysis = st.checkbox("자동 분석", value=False, help="체크하면 페이지 로드 시 자동으로 AI 분석 실행")
         
         if auto_analysis or st.button("🚀 AI 분석 실행", type="primary", key="main_ai_analysis_btn"):
+            stream_box = st.empty()
             with st.spinner("🧠 Gemini가 시장을 분석하고 있습니다..."):
                 try:
-                    analysis_summary = generate_market_summary(df, risk, scenario_info)
+                    analysis_summary = generate_market_summary(df, risk, scenario_num, stream_box)
                     st.session_state['main_ai_analysis'] = analysis_summary
                 except Exception as e:
                     st.error(f"AI 분석 중 오류: {str(e)}")
@@ -1014,6 +1260,7 @@ def main():
                         'strategy': '다시 시도하세요',
                         'full_analysis': f'오류: {str(e)}'
                     }
+            stream_box.empty()
         
         if 'main_ai_analysis' in st.session_state:
             analysis_data = st.session_state['main_ai_analysis']
@@ -1058,6 +1305,12 @@ def main():
         st.error(f"차트 생성 오류: {str(e)}")
         st.exception(e)
     
+    try:
+        timeline_chart = plot_scenario_timeline(df, scenario_history)
+        st.plotly_chart(timeline_chart, use_container_width=True)
+    except Exception as e:
+        st.error(f"시나리오 타임라인 오류: {str(e)}")
+    
     # 탭
     st.markdown("---")
     tab1, tab2, tab3 = st.tabs(["📊 시나리오 분석", "🤖 AI 분석 & 챗봇", "📖 해석 가이드"])
@@ -1072,7 +1325,7 @@ def main():
             st.error(f"시나리오 차트 오류: {str(e)}")
         
         # 시나리오 통계
-        df['Scenario'] = df.apply(lambda row: determine_scenario(row['YIELD_CURVE'], row['POLICY_SPREAD']), axis=1)
+        df['Scenario'] = scenario_history
         
         st.markdown("### 시나리오 분포")
         scenario_counts = df['Scenario'].value_counts().sort_index()
@@ -1080,7 +1333,7 @@ def main():
         for sn in [1, 2, 3, 4]:
             count = scenario_counts.get(sn, 0)
             pct = (count / len(df)) * 100 if len(df) > 0 else 0
-            st.progress(pct / 100, text=f"{SCENARIOS[sn]['title']}: {count}일 ({pct:.1f}%)")
+            st.progress(pct / 100, text=f"{SCENARIO_TITLES[sn - 1]}: {count}일 ({pct:.1f}%)")
     
     with tab2:
         st.markdown("### 🤖 AI 분석")